@@ -20,6 +20,7 @@ a = Analysis(
         'win32con',
         'pywintypes',
         'win32security',
+        'win32file',
         'ntsecuritycon',
         'pystray._win32',
         'PIL._tkinter_finder',
@@ -8,18 +8,25 @@ First instance (server)
   • Creates Named Event  ``Local\\AutoSleepCancel``   — second instance sets this to request cancel
   • Creates Named Event  ``Local\\AutoSleepAck``      — first instance sets on correct password
   • Creates Named Event  ``Local\\AutoSleepNack``     — first instance sets on wrong password
+  • Creates Named Section ``Local\\AutoSleepReq``     — page-file backed shared memory
+                                                        carrying the "password needed"
+                                                        flag and the cancel password
 
 Cancel protocol
-  1. Second instance writes password to temp file, sets cancel event.
+  1. Second instance writes password into the shared section, sets cancel event.
   2. First instance wakes, verifies password.
      - Correct → send_ack()  → timer cancelled.
      - Wrong   → send_nack() → second instance retries.
   3. Second instance calls wait_for_response() which returns 'ack', 'nack', or 'timeout'.
+
+The first instance also owns an unnamed manual-reset "done" event which the
+scheduler sets once the timer has fired, so the cancel monitor can block in a
+single WaitForMultipleObjects on [cancel, done] instead of polling.
 """
 from __future__ import annotations
 
-import tempfile
-from pathlib import Path
+import ctypes
+from ctypes import wintypes
 from typing import Optional
 
 import win32api
@@ -34,15 +41,64 @@ _MUTEX_NAME  = "Local\\AutoSleepRunning"
 _CANCEL_NAME = "Local\\AutoSleepCancel"
 _ACK_NAME    = "Local\\AutoSleepAck"
 _NACK_NAME   = "Local\\AutoSleepNack"
+_SHM_NAME    = "Local\\AutoSleepReq"
+
+# Shared section used to pass the plain-text password from client → server.
+# Layout: 1-byte "password needed" flag written once by the server, then a
+# 2-byte little-endian length prefix and that many UTF-8 bytes per request.
+_SHM_SIZE        = 4096
+_NEEDS_PW_OFFSET = 0
+_REQ_LEN_OFFSET  = 1
+_REQ_DATA_OFFSET = 3
+_REQ_MAX_BYTES   = _SHM_SIZE - _REQ_DATA_OFFSET
+
+# While waiting for ACK/NACK the client re-checks this often that the server
+# is still alive, so a timer that fires mid-attempt doesn't cost the full timeout.
+_PROBE_INTERVAL_MS = 250
+
+# ── Raw kernel32 / advapi32 bindings (pywin32 has no file-mapping API) ─────
+_INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+_PAGE_READWRITE       = 0x04
+_FILE_MAP_WRITE       = 0x0002
+_FILE_MAP_READ        = 0x0004
+_FILE_MAP_ALL_ACCESS  = 0x000F001F
+
+_k32      = ctypes.WinDLL("kernel32", use_last_error=True)
+_advapi32 = ctypes.WinDLL("advapi32", use_last_error=True)
+
+_k32.CreateFileMappingW.argtypes = [wintypes.HANDLE, wintypes.LPVOID, wintypes.DWORD,
+                                    wintypes.DWORD, wintypes.DWORD, wintypes.LPCWSTR]
+_k32.CreateFileMappingW.restype  = wintypes.HANDLE
+_k32.OpenFileMappingW.argtypes   = [wintypes.DWORD, wintypes.BOOL, wintypes.LPCWSTR]
+_k32.OpenFileMappingW.restype    = wintypes.HANDLE
+_k32.MapViewOfFile.argtypes      = [wintypes.HANDLE, wintypes.DWORD, wintypes.DWORD,
+                                    wintypes.DWORD, ctypes.c_size_t]
+_k32.MapViewOfFile.restype       = wintypes.LPVOID
+_k32.UnmapViewOfFile.argtypes    = [wintypes.LPCVOID]
+_k32.UnmapViewOfFile.restype     = wintypes.BOOL
+_k32.CloseHandle.argtypes        = [wintypes.HANDLE]
+_k32.CloseHandle.restype         = wintypes.BOOL
+_k32.WaitForMultipleObjects.argtypes = [wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE),
+                                        wintypes.BOOL, wintypes.DWORD]
+_k32.WaitForMultipleObjects.restype  = wintypes.DWORD
+
+
+class _SECURITY_ATTRIBUTES(ctypes.Structure):
+    _fields_ = [
+        ("nLength",              wintypes.DWORD),
+        ("lpSecurityDescriptor", wintypes.LPVOID),
+        ("bInheritHandle",       wintypes.BOOL),
+    ]
 
-# Temp file used to pass the plain-text password from client → server
-_TEMP_REQUEST = Path(tempfile.gettempdir()) / "as_req.tmp"
 
 # Module-level handles held by the first instance
 _mutex_handle:  Optional[object] = None
 _cancel_handle: Optional[object] = None
 _ack_handle:    Optional[object] = None
 _nack_handle:   Optional[object] = None
+_done_handle:   Optional[object] = None
+_shm_handle:    Optional[int]    = None
+_shm_view:      Optional[ctypes.Array] = None
 
 
 def _get_null_sa() -> win32security.SECURITY_ATTRIBUTES:
@@ -54,46 +110,143 @@ def _get_null_sa() -> win32security.SECURITY_ATTRIBUTES:
     return sa
 
 
+def _get_null_sa_raw() -> tuple[_SECURITY_ATTRIBUTES, ctypes.Array]:
+    """ctypes twin of _get_null_sa() for APIs called without pywin32.
+
+    Returns the structure together with the descriptor buffer it points to;
+    the caller must keep both alive until the create call returns.
+    """
+    sd = ctypes.create_string_buffer(64)   # >= SECURITY_DESCRIPTOR_MIN_LENGTH
+    _advapi32.InitializeSecurityDescriptor(sd, 1)
+    _advapi32.SetSecurityDescriptorDacl(sd, True, None, False)
+    sa = _SECURITY_ATTRIBUTES(ctypes.sizeof(_SECURITY_ATTRIBUTES), ctypes.addressof(sd), False)
+    return sa, sd
+
+
+def _create_request_section() -> tuple[int, ctypes.Array]:
+    """Create the shared password section and map it for the server's lifetime."""
+    sa, _sd = _get_null_sa_raw()
+    handle = _k32.CreateFileMappingW(
+        _INVALID_HANDLE_VALUE, ctypes.byref(sa), _PAGE_READWRITE, 0, _SHM_SIZE, _SHM_NAME,
+    )
+    if not handle:
+        raise ctypes.WinError(ctypes.get_last_error())
+    addr = _k32.MapViewOfFile(handle, _FILE_MAP_ALL_ACCESS, 0, 0, _SHM_SIZE)
+    if not addr:
+        err = ctypes.get_last_error()
+        _k32.CloseHandle(handle)
+        raise ctypes.WinError(err)
+    return handle, (ctypes.c_char * _SHM_SIZE).from_address(addr)
+
+
+def _write_request(password: str) -> bool:
+    """Copy *password* into the server's shared section. Returns False if it is gone."""
+    data = password.encode("utf-8")[:_REQ_MAX_BYTES]
+    handle = _k32.OpenFileMappingW(_FILE_MAP_WRITE, False, _SHM_NAME)
+    if not handle:
+        return False
+    try:
+        addr = _k32.MapViewOfFile(handle, _FILE_MAP_WRITE, 0, 0, _SHM_SIZE)
+        if not addr:
+            return False
+        # Payload first, length last: the length is what publishes the
+        # request, so a reader can never pair it with half-copied bytes.
+        ctypes.memmove(addr + _REQ_DATA_OFFSET, data, len(data))
+        ctypes.memmove(addr + _REQ_LEN_OFFSET, len(data).to_bytes(2, "little"), 2)
+        _k32.UnmapViewOfFile(addr)
+        return True
+    finally:
+        _k32.CloseHandle(handle)
+
+
 # ── First-instance (server) side ───────────────────────────────────────────
-def create_server_objects() -> None:
-    """Create the named mutex and events. Called once by the first instance."""
+def create_server_objects(needs_password: bool = False) -> None:
+    """Create all server-side IPC objects. Called once by the first instance.
+
+    That is the named mutex, the named cancel/ack/nack events, the
+    process-local done event and the shared request section.
+    *needs_password* is published in the shared section so the second instance
+    can tell, without a round-trip, whether to prompt for a password.
+    """
     global _mutex_handle, _cancel_handle, _ack_handle, _nack_handle
+    global _done_handle, _shm_handle, _shm_view
     sa = _get_null_sa()
     _mutex_handle  = win32event.CreateMutex(sa, True, _MUTEX_NAME)
     # Auto-reset events (bManualReset=False) prevent race conditions
     _cancel_handle = win32event.CreateEvent(sa, False, False, _CANCEL_NAME)
     _ack_handle    = win32event.CreateEvent(sa, False, False, _ACK_NAME)
     _nack_handle   = win32event.CreateEvent(sa, False, False, _NACK_NAME)
+    # Process-local and manual-reset: once the timer fires it stays fired
+    _done_handle   = win32event.CreateEvent(None, True, False, None)
+    _shm_handle, _shm_view = _create_request_section()
+    _shm_view[_NEEDS_PW_OFFSET] = b"\x01" if needs_password else b"\x00"
 
 
 def destroy_server_objects() -> None:
     """Release all named objects."""
     global _mutex_handle, _cancel_handle, _ack_handle, _nack_handle
-    for h in (_mutex_handle, _cancel_handle, _ack_handle, _nack_handle):
+    global _done_handle, _shm_handle, _shm_view
+    if _shm_view is not None:
+        ctypes.memset(_shm_view, 0, _SHM_SIZE)
+        _k32.UnmapViewOfFile(ctypes.addressof(_shm_view))
+    for h in (_mutex_handle, _cancel_handle, _ack_handle, _nack_handle,
+              _done_handle, _shm_handle):
         if h is not None:
             try:
                 win32api.CloseHandle(h)
             except Exception:
                 pass
     _mutex_handle = _cancel_handle = _ack_handle = _nack_handle = None
+    _done_handle = _shm_handle = _shm_view = None
 
 
 def wait_for_cancel(timeout_ms: int = win32event.INFINITE) -> bool:
-    """Block until the cancel event is signalled. Returns True if signalled."""
-    if _cancel_handle is None:
+    """Block until a cancel request arrives or the timer fires.
+
+    Returns True only for a cancel request; False once the timer has fired
+    (see signal_timer_fired) or on timeout.
+    """
+    if _cancel_handle is None or _done_handle is None:
         return False
-    result = win32event.WaitForSingleObject(_cancel_handle, timeout_ms)
+    result = win32event.WaitForMultipleObjects([_cancel_handle, _done_handle], False, timeout_ms)
     return result == win32event.WAIT_OBJECT_0
 
 
+def signal_timer_fired() -> None:
+    """Wake wait_for_cancel() for good — the timer has fired, nothing left to cancel."""
+    if _done_handle is not None:
+        win32event.SetEvent(_done_handle)
+
+
+def _wipe(buf: bytearray) -> None:
+    """Zero *buf* in place."""
+    if buf:
+        ctypes.memset((ctypes.c_char * len(buf)).from_buffer(buf), 0, len(buf))
+
+
 def read_cancel_password() -> str:
-    """Read the plain-text password left by the second instance, then delete the file."""
+    """Read the plain-text password left by the second instance, then zero the section.
+
+    The raw bytes are staged in a mutable buffer that is wiped before
+    returning, so the only plaintext left behind is the returned ``str``
+    itself — Python strings are immutable and cannot be scrubbed.
+    """
+    if _shm_view is None:
+        return ""
+    base   = ctypes.addressof(_shm_view)
+    staged = bytearray()
     try:
-        text = _TEMP_REQUEST.read_text(encoding="utf-8")
-        _TEMP_REQUEST.unlink(missing_ok=True)
-        return text
+        size = int.from_bytes(_shm_view[_REQ_LEN_OFFSET:_REQ_LEN_OFFSET + 2], "little")
+        staged = bytearray(min(size, _REQ_MAX_BYTES))
+        if staged:
+            ctypes.memmove((ctypes.c_char * len(staged)).from_buffer(staged),
+                           base + _REQ_DATA_OFFSET, len(staged))
+        return staged.decode("utf-8")
     except Exception:
         return ""
+    finally:
+        _wipe(staged)
+        ctypes.memset(base + _REQ_LEN_OFFSET, 0, _SHM_SIZE - _REQ_LEN_OFFSET)
 
 
 def send_ack() -> None:
@@ -114,6 +267,22 @@ def reset_for_next_attempt() -> None:
 
 
 # ── Second-instance (client) side ─────────────────────────────────────────
+def server_needs_password() -> Optional[bool]:
+    """Return the first instance's "password needed" flag, or None if unreadable."""
+    handle = _k32.OpenFileMappingW(_FILE_MAP_READ, False, _SHM_NAME)
+    if not handle:
+        return None
+    try:
+        addr = _k32.MapViewOfFile(handle, _FILE_MAP_READ, 0, 0, _SHM_SIZE)
+        if not addr:
+            return None
+        flag = ctypes.string_at(addr + _NEEDS_PW_OFFSET, 1)
+        _k32.UnmapViewOfFile(addr)
+        return flag != b"\x00"
+    finally:
+        _k32.CloseHandle(handle)
+
+
 def is_first_instance_running() -> bool:
     """Return True if the first instance's mutex is present."""
     try:
@@ -126,39 +295,77 @@ def is_first_instance_running() -> bool:
         return False
 
 
-def send_cancel_and_wait(password: str, timeout_ms: int = 5000) -> str:
-    """Safely open response handles, signal cancel, and wait for response.
-    
-    Opens ACK/NACK handles before signaling CANCEL to ensure the handles are 
-    held open, preventing the server from destroying them before we can wait.
+class CancelClient:
+    """Second-instance side of the cancel protocol.
+
+    The ACK/NACK handles are opened once, before the first CANCEL is ever
+    signalled, and reused for every retry of the password dialog.  Holding
+    them open also keeps the server from destroying the events before we can
+    wait on them.  Call close() once the dialog is gone.
+
+    The response wait goes straight to kernel32 on a pre-built handle array,
+    skipping pywin32's per-call list → PyHANDLE marshalling.
     """
-    try:
-        ack_h  = win32event.OpenEvent(win32con.SYNCHRONIZE, False, _ACK_NAME)
-        nack_h = win32event.OpenEvent(win32con.SYNCHRONIZE, False, _NACK_NAME)
-    except pywintypes.error:
-        return "timeout"
 
-    _TEMP_REQUEST.write_text(password, encoding="utf-8")
-    
-    try:
-        cancel_h = win32event.OpenEvent(win32con.EVENT_MODIFY_STATE, False, _CANCEL_NAME)
-        win32event.SetEvent(cancel_h)
-        win32api.CloseHandle(cancel_h)
-    except pywintypes.error:
-        win32api.CloseHandle(ack_h)
-        win32api.CloseHandle(nack_h)
-        return "timeout"
-        
-    try:
-        result = win32event.WaitForMultipleObjects([ack_h, nack_h], False, timeout_ms)
-        if result == win32event.WAIT_OBJECT_0:
-            return "ack"
-        elif result == win32event.WAIT_OBJECT_0 + 1:
-            return "nack"
-        else:
+    def __init__(self) -> None:
+        self._ack_h:  Optional[object] = None
+        self._nack_h: Optional[object] = None
+        self._wait_handles: Optional[ctypes.Array] = None
+        try:
+            self._ack_h  = win32event.OpenEvent(win32con.SYNCHRONIZE, False, _ACK_NAME)
+            self._nack_h = win32event.OpenEvent(win32con.SYNCHRONIZE, False, _NACK_NAME)
+        except pywintypes.error:
+            self.close()
+            return
+        self._wait_handles = (wintypes.HANDLE * 2)(int(self._ack_h), int(self._nack_h))
+
+    def send_cancel_and_wait(self, password: str, timeout_ms: int = 5000) -> str:
+        """Signal cancel with *password* and wait. Returns 'ack', 'nack', or 'timeout'.
+
+        If the first instance exits while we wait (its mutex disappears), give
+        up with 'timeout' right away instead of sitting out *timeout_ms*.  A
+        server that is already gone fails the request write and returns at once.
+        """
+        if self._wait_handles is None:
+            return "timeout"
+        if not _write_request(password):
+            return "timeout"
+
+        try:
+            cancel_h = win32event.OpenEvent(win32con.EVENT_MODIFY_STATE, False, _CANCEL_NAME)
+            win32event.SetEvent(cancel_h)
+            win32api.CloseHandle(cancel_h)
+        except pywintypes.error:
             return "timeout"
-    except pywintypes.error:
+
+        remaining_ms = timeout_ms
+        while remaining_ms > 0:
+            slice_ms = min(remaining_ms, _PROBE_INTERVAL_MS)
+            result = _k32.WaitForMultipleObjects(2, self._wait_handles, False, slice_ms)
+            if result == win32event.WAIT_OBJECT_0:
+                return "ack"
+            elif result == win32event.WAIT_OBJECT_0 + 1:
+                return "nack"
+            elif result != win32event.WAIT_TIMEOUT or not is_first_instance_running():
+                break
+            remaining_ms -= slice_ms
         return "timeout"
+
+    def close(self) -> None:
+        """Release the response handles. Safe to call more than once."""
+        for h in (self._ack_h, self._nack_h):
+            if h is not None:
+                try:
+                    win32api.CloseHandle(h)
+                except Exception:
+                    pass
+        self._ack_h = self._nack_h = self._wait_handles = None
+
+
+def send_cancel_and_wait(password: str, timeout_ms: int = 5000) -> str:
+    """One-shot CancelClient: open, send a single attempt, close."""
+    client = CancelClient()
+    try:
+        return client.send_cancel_and_wait(password, timeout_ms)
     finally:
-        win32api.CloseHandle(ack_h)
-        win32api.CloseHandle(nack_h)
+        client.close()
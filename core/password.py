@@ -13,58 +13,156 @@ removing the ACL, so verification works without changing permissions.
 from __future__ import annotations
 
 import os
-import subprocess
+import time
 from pathlib import Path
 from typing import Optional
 
-import bcrypt
+# bcrypt is imported inside set_password()/verify_password(): its compiled
+# extension is only worth loading once a password is actually involved.
+import ntsecuritycon
+import pywintypes
+import win32file
+import win32security
+import winerror
 
 # ── Storage location (disguised under a system-sounding name) ─────────────
 _APP_DIR    = Path(os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))) / "WindowsCfgSvc"
 _PASSWD_FILE = _APP_DIR / "cfg.dat"
 
+# bcrypt work factor.  The hash only guards a local "cancel the timer" dialog
+# that a human retries by typing, so the library default of 12 just makes each
+# retry visibly laggy; 10 is ~4x faster and still far beyond brute-forcing by
+# hand.  Existing hashes keep their own cost, which is encoded in the hash.
+_COST = 10
+
+# Throwaway hash (same cost as real ones) checked when no password is stored,
+# so verification takes the same time whether or not a password exists.
+_DUMMY_HASH = b"$2b$10$RizA/vRvImTwJGNIavmiZO9tf5CyoqYOQhlPhReKXseAHstvG3lNe"
+
+# In-memory copy of cfg.dat, keyed on its mtime so wrong-password retries
+# skip the disk read.  Cleared whenever this module writes or deletes the file.
+_cached_hash:  Optional[bytes] = None
+_cached_mtime: int = 0
+
+# CreateFile retries while another process (AV scanner, indexer) briefly holds
+# cfg.dat open without FILE_SHARE_DELETE
+_DELETE_ATTEMPTS = 5
+_DELETE_RETRY_S  = 0.1
+
 
 # ── Internal helpers ───────────────────────────────────────────────────────
 def _ensure_dir() -> None:
     _APP_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _invalidate_cache() -> None:
+    global _cached_hash, _cached_mtime
+    _cached_hash  = None
+    _cached_mtime = 0
+
+
+def _read_hash() -> Optional[bytes]:
+    """Return the stored hash, or None if no password is set."""
+    global _cached_hash, _cached_mtime
+    try:
+        mtime = _PASSWD_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _cached_hash is None or mtime != _cached_mtime:
+        _cached_hash  = _PASSWD_FILE.read_bytes()
+        _cached_mtime = mtime
+    return _cached_hash
+
+
+def _set_explicit_dacl(path: Path, dacl: win32security.ACL) -> None:
+    """Replace the explicit ACEs on *path* with *dacl*; inherited ACEs are kept.
+
+    Done in-process with SetNamedSecurityInfo rather than spawning icacls.exe.
+    Failures are ignored, as they were with icacls.
+    """
+    try:
+        win32security.SetNamedSecurityInfo(
+            str(path),
+            win32security.SE_FILE_OBJECT,
+            win32security.DACL_SECURITY_INFORMATION
+            | win32security.UNPROTECTED_DACL_SECURITY_INFORMATION,
+            None, None, dacl, None,
+        )
+    except pywintypes.error:
+        pass
+
+
 def _apply_deny_delete(path: Path) -> None:
-    """Add a deny-delete ACE for Everyone on *path* via icacls."""
-    subprocess.run(
-        ["icacls", str(path), "/deny", "Everyone:(D)"],
-        capture_output=True,
-        check=False,
-    )
+    """Add a deny-delete ACE for Everyone on *path* (``icacls /deny Everyone:(D)``)."""
+    everyone = win32security.CreateWellKnownSid(win32security.WinWorldSid, None)
+    dacl = win32security.ACL()
+    dacl.AddAccessDeniedAce(win32security.ACL_REVISION, ntsecuritycon.DELETE, everyone)
+    _set_explicit_dacl(path, dacl)
 
 
 def _remove_deny_delete(path: Path) -> None:
-    """Remove all custom ACEs and restore inherited permissions via icacls."""
-    subprocess.run(
-        ["icacls", str(path), "/reset"],
-        capture_output=True,
-        check=False,
-    )
+    """Remove all custom ACEs and restore inherited permissions (``icacls /reset``)."""
+    _set_explicit_dacl(path, win32security.ACL())
+
+
+def _delete_file(path: Path) -> None:
+    """Delete *path* through one handle: open for DELETE, mark disposition, close.
+
+    A vanished file is not an error (like ``unlink(missing_ok=True)``).  A
+    sharing violation is retried a few times before it is allowed to surface.
+    """
+    for attempt in range(_DELETE_ATTEMPTS):
+        try:
+            handle = win32file.CreateFile(
+                str(path),
+                ntsecuritycon.DELETE,
+                win32file.FILE_SHARE_READ | win32file.FILE_SHARE_WRITE | win32file.FILE_SHARE_DELETE,
+                None,
+                win32file.OPEN_EXISTING,
+                0,
+                None,
+            )
+            break
+        except pywintypes.error as e:
+            code = getattr(e, "winerror", None)
+            if code == winerror.ERROR_FILE_NOT_FOUND:
+                return
+            if code != winerror.ERROR_SHARING_VIOLATION or attempt == _DELETE_ATTEMPTS - 1:
+                raise
+            time.sleep(_DELETE_RETRY_S)
+    try:
+        win32file.SetFileInformationByHandle(handle, win32file.FileDispositionInfo, True)
+    finally:
+        handle.Close()
 
 
 # ── Public API ─────────────────────────────────────────────────────────────
 def set_password(plain: str) -> None:
     """Hash *plain* with bcrypt and write it to storage, then lock the file."""
+    import bcrypt
     _ensure_dir()
-    hashed: bytes = bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt())
+    hashed: bytes = bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(rounds=_COST))
+    _invalidate_cache()
     _PASSWD_FILE.write_bytes(hashed)
     _apply_deny_delete(_PASSWD_FILE)
 
 
 def verify_password(plain: str) -> bool:
-    """Return True if *plain* matches the stored hash, or if no password is set."""
-    if not has_password():
-        return True          # no password configured → always allow cancel
+    """Return True if *plain* matches the stored hash, or if no password is set.
+
+    A full bcrypt comparison runs on every call — against ``_DUMMY_HASH`` when
+    nothing is stored — so timing does not reveal whether a password exists.
+    """
+    import bcrypt
     try:
-        stored = _PASSWD_FILE.read_bytes()
-        return bcrypt.checkpw(plain.encode("utf-8"), stored)
+        stored = _read_hash()
     except Exception:
         return False
+    try:
+        matched = bcrypt.checkpw(plain.encode("utf-8"), _DUMMY_HASH if stored is None else stored)
+    except Exception:
+        matched = False
+    return stored is None or matched   # no password configured → always allow cancel
 
 
 def has_password() -> bool:
@@ -74,13 +172,10 @@ def has_password() -> bool:
 
 def delete_password() -> None:
     """Remove the password file (resets ACL first so deletion is possible)."""
+    _invalidate_cache()
     if _PASSWD_FILE.exists():
         _remove_deny_delete(_PASSWD_FILE)
-        try:
-            _PASSWD_FILE.unlink()
-        except PermissionError:
-            # icacls /reset sometimes needs a moment; retry once
-            _PASSWD_FILE.unlink(missing_ok=True)
+        _delete_file(_PASSWD_FILE)
 
 
 def uninstall_app_data() -> None:
@@ -101,3 +196,4 @@ def _override_paths(app_dir: Path, passwd_file: Path) -> None:  # pragma: no cov
     global _APP_DIR, _PASSWD_FILE
     _APP_DIR     = app_dir
     _PASSWD_FILE = passwd_file
+    _invalidate_cache()
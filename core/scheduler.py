@@ -1,11 +1,14 @@
 """
 scheduler.py — Countdown / target-time shutdown scheduler.
 
-Uses a threading.Event so cancellation is instant with no busy-loop.
+Uses a threading.Event so cancellation is instant with no busy-loop, and the
+module stays portable: a Win32 primitive such as WaitOnAddress would make it
+Windows-only and impossible to test elsewhere.
 """
 from __future__ import annotations
 
 import threading
+import time
 from datetime import datetime, timedelta
 from typing import Callable, Optional
 
@@ -21,26 +24,44 @@ class ShutdownScheduler:
         s.cancel()
     """
 
-    def __init__(self, callback: Callable[[], None]) -> None:
+    def __init__(
+        self,
+        callback: Callable[[], None],
+        _clock: Callable[[], float] = time.monotonic,
+        _wait: Optional[Callable[[float], bool]] = None,
+    ) -> None:
+        """Create an idle scheduler; nothing runs until a schedule_* call.
+
+        Args:
+            callback: Called on the timer thread when the deadline is reached.
+            _clock:   Monotonic time source, in seconds.
+            _wait:    Blocks up to the given seconds and returns True if
+                      cancelled; defaults to the cancel event's wait().
+                      _clock and _wait are used exclusively in unit tests —
+                      never pass them in production code.
+        """
         self._callback = callback
         self._cancel_event = threading.Event()
+        self._clock = _clock
+        self._wait = _wait if _wait is not None else self._cancel_event.wait
         self._thread: Optional[threading.Thread] = None
-        self._fire_at: Optional[datetime] = None
+        self._fire_at: Optional[datetime] = None   # wall-clock, for display only
+        self._deadline: Optional[float] = None     # self._clock() value
 
     # ── Public scheduling API ──────────────────────────────────────────────
     def schedule_duration(self, minutes: float) -> None:
         """Start a timer that fires after *minutes* minutes."""
         if minutes <= 0:
             raise ValueError("minutes must be positive")
-        self._fire_at = datetime.now() + timedelta(minutes=minutes)
-        self._start()
+        self._start(datetime.now() + timedelta(minutes=minutes),
+                    self._clock() + minutes * 60)
 
     def schedule_at(self, target: datetime) -> None:
         """Start a timer that fires at an absolute *target* time."""
-        if target <= datetime.now():
+        now = datetime.now()
+        if target <= now:
             raise ValueError("target time must be in the future")
-        self._fire_at = target
-        self._start()
+        self._start(target, self._clock() + (target - now).total_seconds())
 
     def cancel(self) -> None:
         """Cancel a pending timer. Safe to call even if nothing is scheduled."""
@@ -52,27 +73,33 @@ class ShutdownScheduler:
         """True while the background thread is alive (i.e. timer is pending)."""
         return self._thread is not None and self._thread.is_alive()
 
-    def time_remaining(self) -> Optional[timedelta]:
-        """Remaining time, or None if not scheduled, or timedelta(0) if overdue."""
-        if self._fire_at is None:
+    def time_remaining(self) -> Optional[float]:
+        """Remaining seconds, or None if not scheduled, or 0.0 if overdue.
+
+        Cheap enough to poll from a UI loop: one monotonic read, no datetime
+        objects, and unaffected by wall-clock jumps (NTP sync, DST).
+        """
+        if self._deadline is None:
             return None
-        delta = self._fire_at - datetime.now()
-        return delta if delta.total_seconds() > 0 else timedelta(0)
+        return max(0.0, self._deadline - self._clock())
 
     # ── Internal ───────────────────────────────────────────────────────────
-    def _start(self) -> None:
+    def _start(self, fire_at: datetime, deadline: float) -> None:
         if self.is_active:
             raise RuntimeError("Scheduler is already running; call cancel() first")
+        self._fire_at = fire_at
+        self._deadline = deadline
         self._cancel_event.clear()
         self._thread = threading.Thread(target=self._run, daemon=True, name="sleep-timer")
         self._thread.start()
 
     def _run(self) -> None:
-        delay_s = (self._fire_at - datetime.now()).total_seconds()
-        if delay_s > 0:
-            cancelled = self._cancel_event.wait(timeout=delay_s)
-        else:
-            cancelled = False
-
-        if not cancelled:
-            self._callback()
+        # A single wait is capped at TIMEOUT_MAX and may return before the
+        # deadline, so recompute what is left and re-wait until it is reached.
+        while True:
+            remaining = self._deadline - self._clock()
+            if remaining <= 0:
+                break
+            if self._wait(min(remaining, threading.TIMEOUT_MAX)):
+                return   # cancelled
+        self._callback()
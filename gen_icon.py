@@ -1,3 +1,6 @@
+import base64
+import io
+
 from PIL import Image, ImageDraw
 
 def create_app_icon(filename="icon.ico", size=256):
@@ -34,5 +37,26 @@ def create_app_icon(filename="icon.ico", size=256):
     # Save as ICO
     img.save(filename, format="ICO", sizes=[(256, 256), (128, 128), (64, 64), (48, 48), (32, 32), (16, 16)])
 
+def draw_tray_icon(size=64):
+    # Minimal clock face used by gui/tray.py (embedded there as base64 PNG)
+    img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+
+    cx, cy, r = size // 2, size // 2, size // 2 - 2
+    # Clock face
+    draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=(40, 40, 60), outline=(180, 180, 220), width=2)
+    # Hour hand (pointing ~10); (dx, dy) are cos/sin of 210°-90° and 300°-90°
+    for (dx, dy), length, width in [((-0.5, 0.8660254), r * 0.5, 3), ((-0.8660254, -0.5), r * 0.7, 2)]:
+        draw.line([(cx, cy), (cx + length * dx, cy + length * dy)], fill=(220, 220, 255), width=width)
+    # Center dot
+    draw.ellipse([cx - 2, cy - 2, cx + 2, cy + 2], fill=(255, 255, 255))
+    return img
+
+def tray_icon_png_b64(size=64):
+    # Value for _ICON_PNG_B64 in gui/tray.py
+    buf = io.BytesIO()
+    draw_tray_icon(size).save(buf, format="PNG", optimize=True)
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
 if __name__ == "__main__":
     create_app_icon("icon.ico")
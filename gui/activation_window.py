@@ -31,6 +31,19 @@ _BTN     = "#4e5058"   # normal button
 _BTN_ACT = "#5865F2"   # activate button
 _RED     = "#da373c"   # uninstall / warning
 
+# Whole ttk theme as one Tcl script: a single interpreter round-trip instead
+# of one per style.configure()/style.map() call.
+_STYLE_TCL = f"""
+ttk::style theme use clam
+ttk::style configure . -background {_BG} -foreground {_FG} -font {{{{Segoe UI}} 10}}
+ttk::style configure TNotebook -background {_BG} -borderwidth 0 -padding 0
+ttk::style configure TNotebook.Tab -background {_ENTRY} -foreground {_FG} \\
+    -padding {{20 8}} -font {{{{Segoe UI}} 10 bold}} -borderwidth 0
+ttk::style map TNotebook.Tab -background {{selected {_BTN}}} -foreground {{selected #ffffff}}
+ttk::style configure TFrame -background {_BG}
+ttk::style configure TLabel -background {_BG} -foreground {_FG} -font {{{{Segoe UI}} 10}}
+"""
+
 
 class ActivationWindow:
     """Modal window for scheduling a shutdown.
@@ -75,44 +88,39 @@ class ActivationWindow:
 
     # ── Styles ─────────────────────────────────────────────────────────────
     def _build_styles(self) -> None:
-        style = ttk.Style(self._root)
-        style.theme_use("clam")
-        style.configure(".", background=_BG, foreground=_FG, font=("Segoe UI", 10))
-        style.configure("TNotebook",        background=_BG, borderwidth=0, padding=0)
-        style.configure("TNotebook.Tab",    background=_ENTRY, foreground=_FG,
-                         padding=[20, 8], font=("Segoe UI", 10, "bold"), borderwidth=0)
-        style.map("TNotebook.Tab",
-                  background=[("selected", _BTN)],
-                  foreground=[("selected", "#ffffff")])
-        style.configure("TFrame",  background=_BG)
-        style.configure("TLabel",  background=_BG, foreground=_FG, font=("Segoe UI", 10))
+        self._root.tk.eval(_STYLE_TCL)
         # (We use tk.Button, tk.Entry, tk.Spinbox, tk.Radiobutton directly for flat modern styles)
 
     # ── UI construction ────────────────────────────────────────────────────
     def _build_ui(self) -> None:
         pad = {"padx": 24, "pady": 8}
 
+        # Top-level rows share one grid (laid out in a single pass); widgets
+        # inside each row's frame still pack.  Anchored north like pack was.
+        self._root.grid_columnconfigure(0, weight=1)
+        self._root.grid_anchor("n")
+
         # Title
         tk.Label(
             self._root, text="🕐  Sleep Timer",
             font=("Segoe UI", 16, "bold"),
             bg=_BG, fg=_ACCENT,
-        ).pack(pady=(24, 8))
+        ).grid(row=0, column=0, pady=(24, 8))
 
         # Notebook (Duration / At time)
         nb = ttk.Notebook(self._root)
-        nb.pack(fill="x", padx=24, pady=8)
+        nb.grid(row=1, column=0, sticky="ew", padx=24, pady=8)
 
         self._tab_duration(nb)
         self._tab_attime(nb)
         self._nb = nb
 
         # Separator
-        ttk.Separator(self._root, orient="horizontal").pack(fill="x", padx=24, pady=8)
+        ttk.Separator(self._root, orient="horizontal").grid(row=2, column=0, sticky="ew", padx=24, pady=8)
 
         # Action selection row
         action_frame = ttk.Frame(self._root)
-        action_frame.pack(fill="x", **pad)
+        action_frame.grid(row=3, column=0, sticky="ew", **pad)
         ttk.Label(action_frame, text="Action:", font=("Segoe UI", 10, "bold")).pack(side="left", padx=(0, 16))
         self._action_var = tk.StringVar(value="block")
         
@@ -132,11 +140,11 @@ class ActivationWindow:
         ).pack(side="top", anchor="w", pady=4)
 
         # Separator
-        ttk.Separator(self._root, orient="horizontal").pack(fill="x", padx=24, pady=8)
+        ttk.Separator(self._root, orient="horizontal").grid(row=4, column=0, sticky="ew", padx=24, pady=8)
 
         # Password row
         pw_frame = ttk.Frame(self._root)
-        pw_frame.pack(fill="x", **pad)
+        pw_frame.grid(row=5, column=0, sticky="ew", **pad)
         ttk.Label(pw_frame, text="Password (optional):").pack(side="left")
         self._pw_var = tk.StringVar()
         self._pw_entry = tk.Entry(pw_frame, textvariable=self._pw_var,
@@ -147,7 +155,7 @@ class ActivationWindow:
 
         # Confirm password row
         pw2_frame = ttk.Frame(self._root)
-        pw2_frame.pack(fill="x", **pad)
+        pw2_frame.grid(row=6, column=0, sticky="ew", **pad)
         ttk.Label(pw2_frame, text="Confirm password:").pack(side="left")
         self._pw2_var = tk.StringVar()
         self._pw2_entry = tk.Entry(pw2_frame, textvariable=self._pw2_var,
@@ -158,7 +166,7 @@ class ActivationWindow:
 
         # Buttons row
         btn_frame = ttk.Frame(self._root)
-        btn_frame.pack(fill="x", padx=24, pady=(24, 28))
+        btn_frame.grid(row=7, column=0, sticky="ew", padx=24, pady=(24, 28))
 
         un_btn = tk.Button(
             btn_frame, text="🗑 Uninstall",
@@ -257,15 +265,16 @@ class ActivationWindow:
         else:
             # At-time tab
             raw = self._time_var.get().strip()
+            now = datetime.now()   # one reading, so midnight can't split it
             try:
                 target = datetime.strptime(raw, "%H:%M").replace(
-                    year=datetime.now().year,
-                    month=datetime.now().month,
-                    day=datetime.now().day,
+                    year=now.year,
+                    month=now.month,
+                    day=now.day,
                 )
-                if target <= datetime.now():
+                if target <= now:
                     target += timedelta(days=1)   # tomorrow
-                delta = target - datetime.now()
+                delta = target - now
                 return delta.total_seconds() / 60
             except ValueError:
                 messagebox.showerror("Invalid time",
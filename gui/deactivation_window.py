@@ -8,11 +8,12 @@ The window stays open through the entire check:
   - Timeout         → shows inline warning, auto-closes after 3s
 
 on_submit(password: str) -> str
-    Called in a background thread.
+    Called on a single long-lived worker thread, one attempt at a time.
     Must return 'ack', 'nack', or 'timeout'.
 """
 from __future__ import annotations
 
+import queue
 import threading
 import tkinter as tk
 from tkinter import ttk
@@ -56,6 +57,15 @@ class DeactivationWindow:
 
         self._build_ui()
 
+        # One worker serves every attempt: no thread per retry, and attempts
+        # can never overlap.  Results come back through a queue plus a virtual
+        # event, which Tk dispatches as soon as its event loop sees it.
+        self._pending: queue.Queue[str] = queue.Queue()
+        self._results: queue.Queue[str] = queue.Queue()
+        self._root.bind("<<SubmitDone>>", self._drain_results)
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True, name="cancel-submit")
+        self._worker.start()
+
     # ── UI construction ────────────────────────────────────────────────────
     def _build_ui(self) -> None:
         tk.Label(
@@ -121,13 +131,25 @@ class DeactivationWindow:
 
     # ── Button logic ───────────────────────────────────────────────────────
     def _submit(self) -> None:
+        if self._btn["state"] == "disabled":
+            return   # <Return> still fires while a check is in flight
         pw = self._pw_var.get()
         self._set_loading()
-        threading.Thread(target=self._do_check, args=(pw,), daemon=True).start()
-
-    def _do_check(self, pw: str) -> None:
-        result = self._on_submit(pw)
-        self._root.after(0, self._on_result, result)
+        self._pending.put(pw)
+
+    def _worker_loop(self) -> None:
+        while True:
+            pw = self._pending.get()
+            self._results.put(self._on_submit(pw))
+            self._root.event_generate("<<SubmitDone>>", when="tail")
+
+    def _drain_results(self, _event: tk.Event) -> None:
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                return
+            self._on_result(result)
 
     def _on_result(self, result: str) -> None:
         if result == "ack":
@@ -1,39 +1,46 @@
 """
 tray.py — System-tray icon shown while the timer is active.
 
-The icon is a minimal clock image generated with Pillow (no external asset
-files needed).  The menu has no useful entry for the brother — only a
-grayed-out status label.
+The icon is a minimal clock image embedded as a base64 PNG (no external asset
+files needed; gen_icon.py draws it).  The menu has no useful entry for the
+brother — only a grayed-out status label.
 """
 from __future__ import annotations
 
+import base64
+import functools
+import io
 import threading
 from datetime import timedelta
 from typing import Callable, Optional
 
 import pystray
-from PIL import Image, ImageDraw
+from PIL import Image
 
 
-# ── Icon drawing ───────────────────────────────────────────────────────────
-def _make_icon_image(size: int = 64) -> Image.Image:
-    """Draw a simple clock face as a PIL Image."""
-    img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+# ── Icon image ─────────────────────────────────────────────────────────────
+# 64×64 clock face, pre-rendered as PNG by gen_icon.tray_icon_png_b64() so no
+# Pillow drawing happens at runtime.  Regenerate with:
+#     python -c "import gen_icon; print(gen_icon.tray_icon_png_b64())"
+_ICON_PNG_B64 = (
+    b"iVBORw0KGgoAAAANSUhEUgAAAEAAAABACAYAAACqaXHeAAACBUlEQVR42u2bwY3DIBBF4Ws7"
+    b"SS4pwh1QxBaRMlLEFuEOXEQu61p2D1EU27IdBg8wMwQpl9gC/uPPABY49yltF1+ysb7//Yt9"
+    b"N4SzVw+AIrgWEF9S+PX6HV3H7fZTBITPKZoiOAUIBwyfQzyn8HcgjkLwWoTnAuE5xJcUvgci"
+    b"BQI0i1+2nzLr+FTxtYXvuYHiBFgRP+0XxQmwIj4VAiyJT4EAa+KpEFBqLV+z7OkAhaa2EtNv"
+    b"WLM+NRRg2foxumDR+hQdiUvhwYwrPDX2l+JD6NSIXVsqkx0QQjcTrd0N/kjm1+iGpQtwpLI1"
+    b"N2hzBDgq0QwCnJVpzA8+18pPcn6Y5gHkakRLWCB3A9JBfJVq6AnhKb7vB3c6vZ5fLp1NB2yB"
+    b"mIp3zrn7fWgDgLSECNd4qQKg7wc3jvP/mskB0xlgHB+/WuJFhEDtfIBaoy8lGeLVmcf2cOtk"
+    b"Brd4E9thC1MhWrV+MQDSt8SYj0zePFB79Fk+ilqx/iYAThdI/QhS/HuA1NF/C4ArF9QWv6cD"
+    b"6x0+e2ewrOnCu5dzzgg1Y5+UA7RCiOk3qJaxYv1oB2gNhdhDk6AQ1AKBcmIUVBtJh0A9LouU"
+    b"WJIKIeWscFKSk3RafDkg1MSdtBSeNlLbDUfvC3xujPBsexu9M7QHgRuE6FtjMTCoQNTdG6SA"
+    b"4F7OigVwBIjVLbm48g/PuUQ50ctoQwAAAABJRU5ErkJggg=="
+)
 
-    cx, cy, r = size // 2, size // 2, size // 2 - 2
-    # Clock face
-    draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=(40, 40, 60), outline=(180, 180, 220), width=2)
-    # Hour hand (pointing ~10)
-    import math
-    for angle, length, width in [(210, r * 0.5, 3), (300, r * 0.7, 2)]:
-        rad = math.radians(angle - 90)
-        x2 = cx + length * math.cos(rad)
-        y2 = cy + length * math.sin(rad)
-        draw.line([(cx, cy), (x2, y2)], fill=(220, 220, 255), width=width)
-    # Center dot
-    draw.ellipse([cx - 2, cy - 2, cx + 2, cy + 2], fill=(255, 255, 255))
-    return img
+
+@functools.lru_cache(maxsize=1)
+def _make_icon_image() -> Image.Image:
+    """Decode the pre-rendered clock face once per process."""
+    return Image.open(io.BytesIO(base64.b64decode(_ICON_PNG_B64))).copy()
 
 
 # ── Tray class ─────────────────────────────────────────────────────────────
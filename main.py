@@ -6,7 +6,8 @@ Flow
 1. Check if the first instance's mutex exists (via ipc.is_first_instance_running).
 
 SECOND INSTANCE (timer already running)
-  a. If a password is set → show DeactivationWindow (asks for password).
+  a. If the first instance advertises a password (ipc.server_needs_password)
+     → show DeactivationWindow (asks for password).
   b. Send cancel signal via IPC (signal_cancel).
   c. Wait for the first instance's ACK.
   d. Show success / wrong-password / timeout result.
@@ -15,16 +16,18 @@ FIRST INSTANCE (no timer running)
   a. Show ActivationWindow (set duration/time + optional password).
   b. On "Activate":
        – Store password (if entered) via password.set_password().
-       – Create IPC server objects (mutex + events).
+       – Create IPC server objects (mutex + events + shared section,
+         flagged with whether a password was set).
        – Start ShutdownScheduler.
        – Start SleepTray icon.
        – Begin monitoring the cancel event in a daemon thread.
   c. When cancel signal arrives:
-       – Read password from temp file.
-       – Verify it.
+       – Read password from the shared-memory section.
+       – Verify it (skipped entirely when no password was set).
        – If correct: cancel scheduler, send ACK, stop tray, quit.
-       – If wrong: reset events, keep running.
-  d. When the timer fires naturally: stop tray, execute shutdown.
+       – If wrong: send NACK, keep running (auto-reset events need no reset).
+  d. When the timer fires naturally: stop tray, execute shutdown, then wake
+     the monitor (ipc.signal_timer_fired) so it tears down IPC and exits.
   e. On "Uninstall": call password.uninstall_app_data(), show message, quit.
 """
 from __future__ import annotations
@@ -33,8 +36,6 @@ import ctypes
 import sys
 import os
 import threading
-import tkinter as tk
-from tkinter import messagebox
 
 from core import ipc, password, scheduler, shutdown
 from gui.activation_window import ActivationWindow
@@ -77,69 +78,100 @@ def _ensure_admin() -> None:
 _sched: scheduler.ShutdownScheduler | None = None
 _tray:  SleepTray | None = None
 
+# Cancel vs. timer firing: whichever claims _outcome_lock first wins, so a
+# cancel is never ACKed while lock/shutdown is already under way.
+_outcome_lock = threading.Lock()
+_cancelled    = threading.Event()
+_firing       = threading.Event()
+
 
 # ══════════════════════════════════════════════════════════════════════════
 # SECOND-INSTANCE path
 # ══════════════════════════════════════════════════════════════════════════
 def run_deactivation() -> None:
-    needs_pw = password.has_password()
+    needs_pw = ipc.server_needs_password()
+    if needs_pw is None:
+        needs_pw = password.has_password()
+    client   = ipc.CancelClient()   # ACK/NACK handles reused across retries
 
     def on_submit(pw: str) -> str:
         """Called from a background thread inside DeactivationWindow.
         Sends the cancel signal and waits for ACK or NACK from the first instance.
         Returns 'ack', 'nack', or 'timeout'.
         """
-        return ipc.send_cancel_and_wait(pw, timeout_ms=5000)
+        return client.send_cancel_and_wait(pw, timeout_ms=5000)
 
     win = DeactivationWindow(needs_password=needs_pw, on_submit=on_submit)
-    win.run()
+    try:
+        win.run()
+    finally:
+        client.close()
 
 
 # ══════════════════════════════════════════════════════════════════════════
 # FIRST-INSTANCE path
 # ══════════════════════════════════════════════════════════════════════════
-def _cancel_monitor() -> None:
-    """Daemon thread: waits for a cancel signal, verifies password, acts."""
-    global _sched, _tray
+def _cancel_monitor(needs_password: bool) -> None:
+    """Daemon thread: waits for a cancel signal, verifies password, acts.
 
-    while True:
-        signalled = ipc.wait_for_cancel(timeout_ms=500)
-        if not signalled:
-            # Check if scheduler is still active (it may have just fired)
-            if _sched is not None and not _sched.is_active:
-                break
-            continue
+    A single blocking wait covers both cancel requests and the timer firing,
+    so the thread never polls.  IPC objects are torn down here on the way out,
+    never underneath a pending wait.
+    """
+    global _sched, _tray
 
+    while ipc.wait_for_cancel():
         # Cancel signal received
-        entered = ipc.read_cancel_password()
-        if password.verify_password(entered):
+        entered  = ipc.read_cancel_password()
+        accepted = not needs_password or password.verify_password(entered)
+        with _outcome_lock:
+            if _firing.is_set():
+                # Too late: leave it unanswered, the client reports a timeout
+                continue
+            if accepted:
+                _cancelled.set()
+                if _sched is not None:
+                    _sched.cancel()
+        if accepted:
             # ── Correct password (or no password set) ──────────────────────
-            if _sched is not None:
-                _sched.cancel()
             ipc.send_ack()
-            ipc.destroy_server_objects()
-            password.delete_password()  # Cleanup: password is one-time use
+            try:
+                password.delete_password()  # Cleanup: password is one-time use
+            except Exception:
+                pass   # a leftover file is cleared on next launch
             if _tray is not None:
                 _tray.stop()
             break
         else:
             # ── Wrong password — signal NACK instantly, keep running ────────
             ipc.send_nack()
-            ipc.reset_for_next_attempt()
+
+    ipc.destroy_server_objects()
 
 
 def _on_timer_fired(action: str = "block") -> None:
     """Called by the scheduler thread when time is up — execute shutdown/lock."""
     global _tray
-    ipc.destroy_server_objects()
-    if _tray is not None:
-        _tray.stop()
-    password.delete_password()  # Ensure no password file is left after shutdown
-    
-    if action == "block":
-        shutdown.execute_lock()
-    else:
-        shutdown.execute_shutdown()
+    with _outcome_lock:
+        if _cancelled.is_set():
+            return   # a cancel was ACKed just before the timer fired
+        _firing.set()
+    try:
+        if _tray is not None:
+            _tray.stop()
+        try:
+            password.delete_password()  # Ensure no password file is left after shutdown
+        except Exception:
+            pass   # still lock/shut down; a leftover file is cleared on next launch
+
+        if action == "block":
+            shutdown.execute_lock()
+        else:
+            shutdown.execute_shutdown()
+    finally:
+        # Last, even on failure: once the monitor wakes it releases the mutex
+        # and the main thread exits, taking this one with it
+        ipc.signal_timer_fired()
 
 
 def run_activation() -> None:
@@ -179,7 +211,7 @@ def run_activation() -> None:
         password.set_password(pw)
 
     # Set up IPC objects
-    ipc.create_server_objects()
+    ipc.create_server_objects(needs_password=bool(pw))
 
     # Start scheduler
     action = activated.get("action", "block")
@@ -191,7 +223,9 @@ def run_activation() -> None:
     _tray.start()
 
     # Start cancel monitor daemon thread
-    monitor = threading.Thread(target=_cancel_monitor, daemon=True, name="cancel-monitor")
+    monitor = threading.Thread(
+        target=_cancel_monitor, args=(bool(pw),), daemon=True, name="cancel-monitor",
+    )
     monitor.start()
 
     # Keep main thread alive (tray + monitor run as daemons)
@@ -202,10 +236,9 @@ def run_activation() -> None:
 # Helpers
 # ══════════════════════════════════════════════════════════════════════════
 def _show_simple_message(title: str, msg: str) -> None:
-    root = tk.Tk()
-    root.withdraw()
-    messagebox.showinfo(title, msg)
-    root.destroy()
+    # Plain Win32 box: no Tk round-trip just to show one line of info.
+    MB_OK, MB_ICONINFORMATION = 0x0, 0x40
+    ctypes.windll.user32.MessageBoxW(0, msg, title, MB_OK | MB_ICONINFORMATION)
 
 
 # ══════════════════════════════════════════════════════════════════════════
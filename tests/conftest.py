@@ -0,0 +1,79 @@
+"""
+conftest.py — Shared pywin32 stubs for the test suite.
+
+pywin32 is Windows-only, so bare stand-in modules are registered in
+sys.modules before any test module imports core.*.  They hold only the
+constants, callables and error class the code under test touches, so anything
+else raises AttributeError.  The stubs are installed even on Windows: no test
+should create real named kernel objects or change real ACLs.
+
+Tests that need a different return value or a call record swap a single
+attribute on the stub (e.g. ``monkeypatch.setattr(win32event, "OpenMutex", …)``).
+"""
+from __future__ import annotations
+
+import ctypes
+import itertools
+import sys
+import types
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+
+class _FakePyWinError(Exception):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args)
+        self.winerror = kwargs.get("winerror", 0)
+
+
+class _FakeSecurityDescriptor:
+    def SetSecurityDescriptorDacl(self, *args) -> None:
+        pass
+
+
+# Distinct int handles, as int(PyHANDLE) would give on Windows.
+_next_handle = itertools.count(0x100).__next__
+
+
+def _stub_module(name: str, **attrs: object) -> types.ModuleType:
+    mod = types.ModuleType(name)
+    vars(mod).update(attrs)
+    return mod
+
+
+sys.modules.update({
+    "win32event": _stub_module(
+        "win32event",
+        WAIT_OBJECT_0=0,
+        WAIT_TIMEOUT=258,
+        INFINITE=0xFFFFFFFF,
+        CreateMutex=lambda *a: _next_handle(),
+        CreateEvent=lambda *a: _next_handle(),
+        OpenMutex=lambda *a: _next_handle(),
+        OpenEvent=lambda *a: _next_handle(),
+        SetEvent=lambda *a: None,
+        WaitForMultipleObjects=lambda *a: 0,
+    ),
+    "win32con":   _stub_module("win32con", SYNCHRONIZE=0x00100000, EVENT_MODIFY_STATE=0x0002),
+    "win32api":   _stub_module("win32api", CloseHandle=lambda *a: None),
+    "pywintypes": _stub_module("pywintypes", error=_FakePyWinError),
+    "winerror":   _stub_module(
+        "winerror",
+        ERROR_FILE_NOT_FOUND=2,
+        ERROR_ACCESS_DENIED=5,
+        ERROR_SHARING_VIOLATION=32,
+    ),
+    # test_password swaps win32security and win32file for MagicMocks per test
+    "win32security": _stub_module(
+        "win32security",
+        SECURITY_DESCRIPTOR=_FakeSecurityDescriptor,
+        SECURITY_ATTRIBUTES=SimpleNamespace,
+    ),
+    "win32file":     _stub_module("win32file"),
+    "ntsecuritycon": _stub_module("ntsecuritycon", DELETE=0x00010000),
+})
+
+# ctypes.WinDLL only exists on Windows; test_ipc swaps the kernel32/advapi32
+# bindings for fakes on every platform anyway.
+if not hasattr(ctypes, "WinDLL"):
+    ctypes.WinDLL = MagicMock()
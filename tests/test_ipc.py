@@ -1,63 +1,50 @@
 """
 test_ipc.py — Unit tests for core/ipc.py.
 
-All Win32 handle operations are mocked with simple fakes so the tests
-run without touching real named kernel objects (which would require certain
-Windows privileges and could interfere with a real running instance).
+All Win32 handle operations go to the pywin32 stubs from conftest.py and a
+fake kernel32, so the tests run without touching real named kernel objects
+(which would require certain Windows privileges and could interfere with a
+real running instance).
 """
 from __future__ import annotations
 
-import tempfile
-from pathlib import Path
-from unittest.mock import MagicMock, patch, call
+import ctypes
+import types
+from unittest.mock import MagicMock, patch
 
 import pytest
+import pywintypes
+import win32api
+import win32event
+from win32event import INFINITE, WAIT_OBJECT_0, WAIT_TIMEOUT
 
+import core.ipc as ipc_mod
 
-# ── Fake win32event constants / functions ──────────────────────────────────
-WAIT_OBJECT_0 = 0
-WAIT_TIMEOUT  = 258
-INFINITE      = 0xFFFFFFFF
 
-_fake_win32event = MagicMock()
-_fake_win32event.WAIT_OBJECT_0 = WAIT_OBJECT_0
-_fake_win32event.WAIT_TIMEOUT  = WAIT_TIMEOUT
-_fake_win32event.INFINITE      = INFINITE
+def _raiser(exc: Exception):
+    """Return a callable that raises *exc* whatever it is called with."""
+    def _raise(*args):
+        raise exc
+    return _raise
 
-_fake_win32con = MagicMock()
-_fake_win32con.SYNCHRONIZE        = 0x00100000
-_fake_win32con.EVENT_MODIFY_STATE = 0x0002
 
-import sys
+def _spy(monkeypatch: pytest.MonkeyPatch, mod: types.ModuleType, name: str) -> MagicMock:
+    """Wrap one module-level function in a recording MagicMock for this test only."""
+    mock = MagicMock(wraps=getattr(mod, name))
+    monkeypatch.setattr(mod, name, mock)
+    return mock
 
-_fake_win32api = MagicMock()
 
-_fake_pywintypes = MagicMock()
-class _FakePyWinError(Exception):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args)
-        self.winerror = kwargs.get('winerror', 0)
-_fake_pywintypes.error = _FakePyWinError
-
-_fake_winerror = MagicMock()
-_fake_winerror.ERROR_ACCESS_DENIED = 5
-
-_fake_win32security = MagicMock()
-
-sys.modules.setdefault("win32event", _fake_win32event)
-sys.modules.setdefault("win32con",   _fake_win32con)
-sys.modules.setdefault("win32api",   _fake_win32api)
-sys.modules.setdefault("pywintypes", _fake_pywintypes)
-sys.modules.setdefault("winerror",   _fake_winerror)
-sys.modules.setdefault("win32security", _fake_win32security)
-
-import core.ipc as ipc_mod   # noqa: E402 — import after mocks are inserted
-
-
-# ── Fixture: redirect temp request file to pytest tmp ─────────────────────
+# ── Fixture: back the shared section with a plain process-local buffer ────
 @pytest.fixture(autouse=True)
-def patch_temp_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setattr(ipc_mod, "_TEMP_REQUEST", tmp_path / "as_req.tmp")
+def shm_buffer(monkeypatch: pytest.MonkeyPatch) -> ctypes.Array:
+    """Fake kernel32 whose MapViewOfFile hands out the same local buffer."""
+    buf = ctypes.create_string_buffer(ipc_mod._SHM_SIZE)
+    k32 = MagicMock()
+    k32.MapViewOfFile.return_value = ctypes.addressof(buf)
+    monkeypatch.setattr(ipc_mod, "_k32", k32)
+    monkeypatch.setattr(ipc_mod, "_advapi32", MagicMock())
+    return buf
 
 
 @pytest.fixture(autouse=True)
@@ -66,83 +53,228 @@ def reset_handles(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(ipc_mod, "_mutex_handle",  None)
     monkeypatch.setattr(ipc_mod, "_cancel_handle", None)
     monkeypatch.setattr(ipc_mod, "_ack_handle",    None)
+    monkeypatch.setattr(ipc_mod, "_nack_handle",   None)
+    monkeypatch.setattr(ipc_mod, "_done_handle",   None)
+    monkeypatch.setattr(ipc_mod, "_shm_handle",    None)
+    monkeypatch.setattr(ipc_mod, "_shm_view",      None)
 
 
 # ── create_server_objects ──────────────────────────────────────────────────
 class TestCreateServerObjects:
-    def test_creates_three_objects(self) -> None:
-        _fake_win32event.CreateMutex.return_value  = MagicMock(name="mutex")
-        _fake_win32event.CreateEvent.return_value  = MagicMock(name="event")
+    def test_creates_three_objects(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        create_mutex = _spy(monkeypatch, win32event, "CreateMutex")
+        create_event = _spy(monkeypatch, win32event, "CreateEvent")
+        ipc_mod.create_server_objects()
+        assert create_mutex.called
+        assert create_event.call_count >= 2
+
+    def test_maps_request_section(self) -> None:
         ipc_mod.create_server_objects()
-        assert _fake_win32event.CreateMutex.called
-        assert _fake_win32event.CreateEvent.call_count >= 2
+        assert ipc_mod._k32.CreateFileMappingW.called
+        assert ipc_mod._shm_view is not None
 
 
 # ── destroy_server_objects ─────────────────────────────────────────────────
 class TestDestroyServerObjects:
-    def test_closes_all_handles(self) -> None:
-        h1, h2, h3 = MagicMock(), MagicMock(), MagicMock()
-        ipc_mod._mutex_handle  = h1
-        ipc_mod._cancel_handle = h2
-        ipc_mod._ack_handle    = h3
+    def test_closes_all_handles(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        close = _spy(monkeypatch, win32api, "CloseHandle")
+        ipc_mod._mutex_handle  = object()
+        ipc_mod._cancel_handle = object()
+        ipc_mod._ack_handle    = object()
         ipc_mod.destroy_server_objects()
-        assert _fake_win32api.CloseHandle.call_count >= 3
+        assert close.call_count >= 3
 
     def test_noop_if_no_handles(self) -> None:
         ipc_mod.destroy_server_objects()  # should not raise
 
+    def test_unmaps_and_zeroes_section(self, shm_buffer: ctypes.Array) -> None:
+        ipc_mod.create_server_objects()
+        shm_buffer[:4] = b"\x02\x00hi"
+        ipc_mod.destroy_server_objects()
+        assert ipc_mod._k32.UnmapViewOfFile.called
+        assert ipc_mod._shm_view is None
+        assert shm_buffer.raw == bytes(ipc_mod._SHM_SIZE)
+
 
 # ── wait_for_cancel ────────────────────────────────────────────────────────
 class TestWaitForCancel:
-    def test_returns_true_on_signal(self) -> None:
-        ipc_mod._cancel_handle = MagicMock()
-        _fake_win32event.WaitForSingleObject.return_value = WAIT_OBJECT_0
+    @pytest.fixture(autouse=True)
+    def handles(self) -> None:
+        ipc_mod._cancel_handle = object()
+        ipc_mod._done_handle   = object()
+
+    @staticmethod
+    def _wait_returns(monkeypatch: pytest.MonkeyPatch, result: int) -> None:
+        monkeypatch.setattr(win32event, "WaitForMultipleObjects", lambda *a: result)
+
+    def test_returns_true_on_signal(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self._wait_returns(monkeypatch, WAIT_OBJECT_0)
         assert ipc_mod.wait_for_cancel(timeout_ms=100) is True
 
-    def test_returns_false_on_timeout(self) -> None:
-        ipc_mod._cancel_handle = MagicMock()
-        _fake_win32event.WaitForSingleObject.return_value = WAIT_TIMEOUT
+    def test_returns_false_when_timer_fired(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self._wait_returns(monkeypatch, WAIT_OBJECT_0 + 1)
+        assert ipc_mod.wait_for_cancel() is False
+
+    def test_returns_false_on_timeout(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self._wait_returns(monkeypatch, WAIT_TIMEOUT)
         assert ipc_mod.wait_for_cancel(timeout_ms=100) is False
 
+    def test_waits_on_cancel_and_done_together(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        wait = _spy(monkeypatch, win32event, "WaitForMultipleObjects")
+        ipc_mod.wait_for_cancel()
+        wait.assert_called_once_with(
+            [ipc_mod._cancel_handle, ipc_mod._done_handle], False, INFINITE,
+        )
+
     def test_returns_false_if_no_handle(self) -> None:
+        ipc_mod._cancel_handle = ipc_mod._done_handle = None
         assert ipc_mod.wait_for_cancel(timeout_ms=100) is False
 
 
+# ── signal_timer_fired ─────────────────────────────────────────────────────
+class TestSignalTimerFired:
+    def test_sets_done_event(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        set_event = _spy(monkeypatch, win32event, "SetEvent")
+        done = object()
+        ipc_mod._done_handle = done
+        ipc_mod.signal_timer_fired()
+        set_event.assert_called_once_with(done)
+
+    def test_noop_if_no_handle(self) -> None:
+        ipc_mod.signal_timer_fired()   # should not raise
+
+
 # ── send_cancel_and_wait / read_cancel_password ───────────────────────────
 class TestSendCancelAndWait:
-    def test_signal_then_read(self, tmp_path: Path) -> None:
-        req_file = tmp_path / "as_req.tmp"
-        ipc_mod._TEMP_REQUEST = req_file
-        
-        # Suppress actual event opens
-        _fake_win32event.OpenEvent.return_value = MagicMock()
-        _fake_win32event.WaitForMultipleObjects.return_value = WAIT_OBJECT_0  # simulates 'ack'
-        
+    def test_signal_then_read(self, shm_buffer: ctypes.Array) -> None:
+        ipc_mod.create_server_objects()
+        ipc_mod._k32.WaitForMultipleObjects.return_value = WAIT_OBJECT_0  # simulates 'ack'
+
         result = ipc_mod.send_cancel_and_wait("mypassword")
         assert result == "ack"
-        assert req_file.exists()
-        
+        assert b"mypassword" in shm_buffer.raw
+
         read_back = ipc_mod.read_cancel_password()
         assert read_back == "mypassword"
-        assert not req_file.exists()   # file deleted after read
+        assert b"mypassword" not in shm_buffer.raw   # zeroed after read
+
+    def test_unicode_round_trip(self) -> None:
+        ipc_mod.create_server_objects()
+        ipc_mod._k32.WaitForMultipleObjects.return_value = WAIT_OBJECT_0
+        ipc_mod.send_cancel_and_wait("пароль🔒")
+        assert ipc_mod.read_cancel_password() == "пароль🔒"
+
+    def test_length_prefix_written_after_payload(self) -> None:
+        ipc_mod.create_server_objects()
+        with patch.object(ipc_mod.ctypes, "memmove", wraps=ctypes.memmove) as mock_move:
+            ipc_mod.send_cancel_and_wait("pw")
+        base = ctypes.addressof(ipc_mod._shm_view)
+        targets = [c.args[0] for c in mock_move.call_args_list]
+        assert targets == [base + ipc_mod._REQ_DATA_OFFSET, base + ipc_mod._REQ_LEN_OFFSET]
 
-    def test_read_returns_empty_if_no_file(self, tmp_path: Path) -> None:
-        req_file = tmp_path / "does_not_exist.tmp"
-        ipc_mod._TEMP_REQUEST = req_file
+    def test_timeout_if_section_missing(self) -> None:
+        ipc_mod._k32.OpenFileMappingW.return_value = None
+        assert ipc_mod.send_cancel_and_wait("pw") == "timeout"
+
+    def test_staging_buffer_is_wiped(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        ipc_mod.create_server_objects()
+        ipc_mod.send_cancel_and_wait("secret")
+        wipe = _spy(monkeypatch, ipc_mod, "_wipe")
+        assert ipc_mod.read_cancel_password() == "secret"
+        wipe.assert_called_once()
+        staged = wipe.call_args.args[0]
+        assert len(staged) == len(b"secret") and not any(staged)
+
+    def test_read_returns_empty_if_no_section(self) -> None:
+        assert ipc_mod.read_cancel_password() == ""
+
+    def test_read_returns_empty_if_nothing_written(self) -> None:
+        ipc_mod.create_server_objects()
         assert ipc_mod.read_cancel_password() == ""
 
 
+# ── server_needs_password ──────────────────────────────────────────────────
+class TestServerNeedsPassword:
+    def test_true_when_server_has_password(self) -> None:
+        ipc_mod.create_server_objects(needs_password=True)
+        assert ipc_mod.server_needs_password() is True
+
+    def test_false_when_server_has_no_password(self) -> None:
+        ipc_mod.create_server_objects(needs_password=False)
+        assert ipc_mod.server_needs_password() is False
+
+    def test_flag_survives_request_read(self) -> None:
+        ipc_mod.create_server_objects(needs_password=True)
+        ipc_mod._k32.WaitForMultipleObjects.return_value = WAIT_OBJECT_0
+        ipc_mod.send_cancel_and_wait("pw")
+        ipc_mod.read_cancel_password()
+        assert ipc_mod.server_needs_password() is True
+
+    def test_none_if_section_missing(self) -> None:
+        ipc_mod._k32.OpenFileMappingW.return_value = None
+        assert ipc_mod.server_needs_password() is None
+
+
+# ── CancelClient ───────────────────────────────────────────────────────────
+class TestCancelClient:
+    @pytest.fixture(autouse=True)
+    def server(self) -> None:
+        ipc_mod.create_server_objects()
+
+    def test_opens_response_handles_once_across_retries(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        ipc_mod._k32.WaitForMultipleObjects.return_value = WAIT_OBJECT_0 + 1   # 'nack'
+        client = ipc_mod.CancelClient()
+        open_event = _spy(monkeypatch, win32event, "OpenEvent")
+        assert client.send_cancel_and_wait("wrong1") == "nack"
+        assert client.send_cancel_and_wait("wrong2") == "nack"
+        # Only the CANCEL event is opened per attempt
+        assert open_event.call_count == 2
+        client.close()
+
+    def test_waits_on_prebuilt_handle_array(self) -> None:
+        ipc_mod._k32.WaitForMultipleObjects.return_value = WAIT_TIMEOUT
+        client = ipc_mod.CancelClient()
+        assert client.send_cancel_and_wait("pw", timeout_ms=123) == "timeout"
+        assert client.send_cancel_and_wait("pw", timeout_ms=123) == "timeout"
+        calls = ipc_mod._k32.WaitForMultipleObjects.call_args_list
+        assert calls[0].args == (2, client._wait_handles, False, 123)
+        assert calls[0].args[1] is calls[1].args[1]
+        client.close()
+
+    def test_waits_full_timeout_in_slices_while_server_alive(self) -> None:
+        ipc_mod._k32.WaitForMultipleObjects.return_value = WAIT_TIMEOUT
+        client = ipc_mod.CancelClient()
+        assert client.send_cancel_and_wait("pw", timeout_ms=600) == "timeout"
+        slices = [c.args[3] for c in ipc_mod._k32.WaitForMultipleObjects.call_args_list]
+        assert slices == [250, 250, 100]
+        client.close()
+
+    def test_gives_up_early_when_server_exits(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        ipc_mod._k32.WaitForMultipleObjects.return_value = WAIT_TIMEOUT
+        monkeypatch.setattr(win32event, "OpenMutex", _raiser(pywintypes.error("gone")))
+        client = ipc_mod.CancelClient()
+        assert client.send_cancel_and_wait("pw", timeout_ms=5000) == "timeout"
+        assert ipc_mod._k32.WaitForMultipleObjects.call_count == 1
+        client.close()
+
+    def test_close_releases_handles_and_is_idempotent(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        client = ipc_mod.CancelClient()
+        close = _spy(monkeypatch, win32api, "CloseHandle")
+        client.close()
+        client.close()
+        assert close.call_count == 2
+
+    def test_timeout_if_server_missing(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(win32event, "OpenEvent", _raiser(pywintypes.error("not found")))
+        client = ipc_mod.CancelClient()
+        assert client.send_cancel_and_wait("pw") == "timeout"
+
+
 # ── is_first_instance_running ─────────────────────────────────────────────
 class TestIsFirstInstanceRunning:
     def test_true_when_mutex_opens(self) -> None:
-        _fake_win32event.OpenMutex.return_value = MagicMock()
-        # Reset side_effect so it does NOT raise
-        _fake_win32event.OpenMutex.side_effect = None
         assert ipc_mod.is_first_instance_running() is True
 
-    def test_false_when_mutex_missing(self) -> None:
-        import pywintypes as _pywt
-        _pywt.error = type("error", (Exception,), {})
-        _fake_win32event.OpenMutex.side_effect = _pywt.error("not found")
+    def test_false_when_mutex_missing(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(win32event, "OpenMutex", _raiser(pywintypes.error("not found")))
         assert ipc_mod.is_first_instance_running() is False
-        _fake_win32event.OpenMutex.side_effect = None   # reset
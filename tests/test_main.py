@@ -0,0 +1,123 @@
+"""
+test_main.py — Unit tests for the first-instance handshake in main.py.
+
+_cancel_monitor and _on_timer_fired are driven directly.  The GUI modules
+are stubbed out, and ipc/password/shutdown are replaced with MagicMocks, so
+nothing is shown, locked or shut down.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import types
+from unittest.mock import MagicMock
+
+import pytest
+
+# The windows and the tray need tkinter/pystray; main only references the classes.
+for _name, _cls in (
+    ("gui.activation_window",   "ActivationWindow"),
+    ("gui.deactivation_window", "DeactivationWindow"),
+    ("gui.tray",                "SleepTray"),
+):
+    _mod = types.ModuleType(_name)
+    setattr(_mod, _cls, MagicMock(name=_cls))
+    sys.modules.setdefault(_name, _mod)
+
+import main   # noqa: E402 — import after stubs are inserted
+
+
+# ── Fixtures ───────────────────────────────────────────────────────────────
+@pytest.fixture(autouse=True)
+def fakes(monkeypatch: pytest.MonkeyPatch) -> types.SimpleNamespace:
+    """Fresh handshake state plus fake ipc/password/shutdown for each test."""
+    fake = types.SimpleNamespace(
+        ipc=MagicMock(name="ipc"),
+        password=MagicMock(name="password"),
+        shutdown=MagicMock(name="shutdown"),
+        sched=MagicMock(name="sched"),
+        tray=MagicMock(name="tray"),
+    )
+    fake.ipc.read_cancel_password.return_value = "pw"
+    fake.password.verify_password.return_value = True
+    monkeypatch.setattr(main, "ipc",           fake.ipc)
+    monkeypatch.setattr(main, "password",      fake.password)
+    monkeypatch.setattr(main, "shutdown",      fake.shutdown)
+    monkeypatch.setattr(main, "_sched",        fake.sched)
+    monkeypatch.setattr(main, "_tray",         fake.tray)
+    monkeypatch.setattr(main, "_outcome_lock", threading.Lock())
+    monkeypatch.setattr(main, "_cancelled",    threading.Event())
+    monkeypatch.setattr(main, "_firing",       threading.Event())
+    return fake
+
+
+def _one_cancel_request(fake: types.SimpleNamespace) -> None:
+    """Make the monitor see a single cancel request, then the timer firing."""
+    fake.ipc.wait_for_cancel.side_effect = [True, False]
+
+
+# ── _cancel_monitor ────────────────────────────────────────────────────────
+class TestCancelMonitor:
+    def test_correct_password_acks_and_cancels(self, fakes: types.SimpleNamespace) -> None:
+        _one_cancel_request(fakes)
+        main._cancel_monitor(needs_password=True)
+        fakes.sched.cancel.assert_called_once()
+        fakes.ipc.send_ack.assert_called_once()
+        fakes.tray.stop.assert_called_once()
+        fakes.ipc.destroy_server_objects.assert_called_once()
+
+    def test_wrong_password_nacks_and_keeps_waiting(self, fakes: types.SimpleNamespace) -> None:
+        _one_cancel_request(fakes)
+        fakes.password.verify_password.return_value = False
+        main._cancel_monitor(needs_password=True)
+        fakes.ipc.send_nack.assert_called_once()
+        fakes.ipc.send_ack.assert_not_called()
+        fakes.sched.cancel.assert_not_called()
+        assert fakes.ipc.wait_for_cancel.call_count == 2
+
+    def test_failed_delete_after_ack_still_cleans_up(self, fakes: types.SimpleNamespace) -> None:
+        _one_cancel_request(fakes)
+        fakes.password.delete_password.side_effect = OSError("sharing violation")
+        main._cancel_monitor(needs_password=False)
+        fakes.ipc.send_ack.assert_called_once()
+        fakes.tray.stop.assert_called_once()
+        fakes.ipc.destroy_server_objects.assert_called_once()
+
+
+# ── _on_timer_fired ────────────────────────────────────────────────────────
+class TestOnTimerFired:
+    def test_locks_and_wakes_monitor(self, fakes: types.SimpleNamespace) -> None:
+        main._on_timer_fired("block")
+        fakes.shutdown.execute_lock.assert_called_once()
+        fakes.shutdown.execute_shutdown.assert_not_called()
+        fakes.ipc.signal_timer_fired.assert_called_once()
+
+    def test_cancel_during_firing_gets_no_answer(self, fakes: types.SimpleNamespace) -> None:
+        # The request arrives while the lock call is under way.
+        _one_cancel_request(fakes)
+        fakes.shutdown.execute_lock.side_effect = lambda: main._cancel_monitor(needs_password=False)
+        main._on_timer_fired("block")
+        fakes.ipc.send_ack.assert_not_called()
+        fakes.ipc.send_nack.assert_not_called()
+        fakes.sched.cancel.assert_not_called()
+        fakes.ipc.signal_timer_fired.assert_called_once()
+
+    def test_timer_after_ack_does_nothing(self, fakes: types.SimpleNamespace) -> None:
+        _one_cancel_request(fakes)
+        main._cancel_monitor(needs_password=False)
+        fakes.password.delete_password.reset_mock()
+        main._on_timer_fired("shutdown")
+        fakes.shutdown.execute_shutdown.assert_not_called()
+        fakes.password.delete_password.assert_not_called()
+
+    def test_failed_delete_still_shuts_down(self, fakes: types.SimpleNamespace) -> None:
+        fakes.password.delete_password.side_effect = OSError("sharing violation")
+        main._on_timer_fired("shutdown")
+        fakes.shutdown.execute_shutdown.assert_called_once()
+        fakes.ipc.signal_timer_fired.assert_called_once()
+
+    def test_monitor_is_woken_even_if_action_fails(self, fakes: types.SimpleNamespace) -> None:
+        fakes.shutdown.execute_shutdown.side_effect = RuntimeError("shutdown.exe missing")
+        with pytest.raises(RuntimeError):
+            main._on_timer_fired("shutdown")
+        fakes.ipc.signal_timer_fired.assert_called_once()
@@ -3,18 +3,23 @@ test_password.py — Unit tests for core/password.py.
 
 All tests redirect storage to a temporary directory so the real
 %LOCALAPPDATA%\\WindowsCfgSvc path is never touched.
-NTFS icacls calls are mocked so the tests run on any user account.
+NTFS ACL and handle-based delete calls are mocked so the tests run on any
+user account; the remaining pywin32 stubs come from conftest.py.
 """
 from __future__ import annotations
 
-import subprocess
+import sys
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
+import winerror
 
 import core.password as pwd_mod
 
+# Nearly every test hashes for real at the production bcrypt cost.
+pytestmark = pytest.mark.slow
+
 
 # ── Fixtures ───────────────────────────────────────────────────────────────
 @pytest.fixture(autouse=True)
@@ -28,12 +33,39 @@ def tmp_storage(tmp_path: Path) -> None:
 
 
 @pytest.fixture(autouse=True)
-def mock_icacls(monkeypatch: pytest.MonkeyPatch) -> None:
-    """Suppress real icacls calls (NTFS ACL changes) during tests."""
-    monkeypatch.setattr(
-        subprocess, "run",
-        lambda *a, **kw: subprocess.CompletedProcess(a, 0),
-    )
+def mock_acl(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Suppress real NTFS ACL changes during tests."""
+    fake = MagicMock()
+    monkeypatch.setattr(pwd_mod, "win32security", fake)
+    return fake
+
+
+class _FakeFileHandle:
+    def __init__(self, name: str) -> None:
+        self.path = Path(name)
+        self.closed = False
+
+    def Close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def mock_win32file(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Fake win32file whose delete-disposition call really unlinks the file."""
+    fake = MagicMock()
+    fake.CreateFile.side_effect = lambda name, *a: _FakeFileHandle(name)
+    fake.SetFileInformationByHandle.side_effect = lambda h, cls, delete: h.path.unlink()
+    monkeypatch.setattr(pwd_mod, "win32file", fake)
+    return fake
+
+
+# ── lazy bcrypt import ─────────────────────────────────────────────────────
+class TestLazyBcrypt:
+    def test_no_password_paths_do_not_import_bcrypt(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setitem(sys.modules, "bcrypt", None)   # any import now fails
+        assert not pwd_mod.has_password()
+        pwd_mod.delete_password()
+        pwd_mod.uninstall_app_data()
 
 
 # ── has_password ───────────────────────────────────────────────────────────
@@ -72,6 +104,17 @@ class TestSetAndVerify:
         assert not pwd_mod.has_password()
         assert pwd_mod.verify_password("anything")
 
+    def test_no_password_still_runs_bcrypt(self) -> None:
+        """Verification cost must not depend on whether a password is stored."""
+        with patch("bcrypt.checkpw", return_value=False) as mock_check:
+            assert pwd_mod.verify_password("anything")
+        mock_check.assert_called_once_with(b"anything", pwd_mod._DUMMY_HASH)
+
+    def test_hash_uses_configured_cost(self) -> None:
+        pwd_mod.set_password("secret")
+        assert pwd_mod._PASSWD_FILE.read_bytes().startswith(b"$2b$%02d$" % pwd_mod._COST)
+        assert pwd_mod._DUMMY_HASH.startswith(b"$2b$%02d$" % pwd_mod._COST)
+
     def test_verify_handles_corrupt_file(self, tmp_path: Path) -> None:
         """If the file is corrupt, verify should return False (fail safe)."""
         pwd_mod._PASSWD_FILE.parent.mkdir(parents=True, exist_ok=True)
@@ -79,6 +122,54 @@ class TestSetAndVerify:
         assert not pwd_mod.verify_password("anything")
 
 
+# ── NTFS ACL ───────────────────────────────────────────────────────────────
+class TestDenyDeleteAcl:
+    def test_set_applies_deny_delete_ace(self, mock_acl: MagicMock) -> None:
+        pwd_mod.set_password("secret")
+        dacl = mock_acl.ACL.return_value
+        dacl.AddAccessDeniedAce.assert_called_once()
+        args = mock_acl.SetNamedSecurityInfo.call_args.args
+        assert args[0] == str(pwd_mod._PASSWD_FILE)
+        assert args[5] is dacl
+
+    def test_delete_resets_acl_before_unlink(self, mock_acl: MagicMock) -> None:
+        pwd_mod.set_password("secret")
+        mock_acl.reset_mock()
+        pwd_mod.delete_password()
+        assert mock_acl.SetNamedSecurityInfo.call_count == 1
+        mock_acl.ACL.return_value.AddAccessDeniedAce.assert_not_called()
+
+    def test_acl_errors_are_ignored(self, mock_acl: MagicMock) -> None:
+        mock_acl.SetNamedSecurityInfo.side_effect = pwd_mod.pywintypes.error("denied")
+        pwd_mod.set_password("secret")   # must not raise
+        assert pwd_mod.verify_password("secret")
+
+
+# ── hash cache ─────────────────────────────────────────────────────────────
+class TestHashCache:
+    def test_repeated_verify_reads_file_once(self) -> None:
+        pwd_mod.set_password("secret")
+        with patch.object(Path, "read_bytes", autospec=True,
+                          side_effect=Path.read_bytes) as mock_read:
+            assert not pwd_mod.verify_password("wrong")
+            assert not pwd_mod.verify_password("wrong again")
+            assert pwd_mod.verify_password("secret")
+        assert mock_read.call_count == 1
+
+    def test_set_password_invalidates_cache(self) -> None:
+        pwd_mod.set_password("first")
+        assert pwd_mod.verify_password("first")
+        pwd_mod.set_password("second")
+        assert pwd_mod.verify_password("second")
+        assert not pwd_mod.verify_password("first")
+
+    def test_delete_password_invalidates_cache(self) -> None:
+        pwd_mod.set_password("secret")
+        assert not pwd_mod.verify_password("other")
+        pwd_mod.delete_password()
+        assert pwd_mod.verify_password("other")
+
+
 # ── delete_password ────────────────────────────────────────────────────────
 class TestDeletePassword:
     def test_delete_removes_file(self) -> None:
@@ -90,6 +181,50 @@ class TestDeletePassword:
     def test_delete_noop_if_no_file(self) -> None:
         pwd_mod.delete_password()   # must not raise
 
+    def test_delete_uses_disposition_on_one_handle(self, mock_win32file: MagicMock) -> None:
+        pwd_mod.set_password("bye")
+        pwd_mod.delete_password()
+        mock_win32file.CreateFile.assert_called_once()
+        handle, info_class, delete = mock_win32file.SetFileInformationByHandle.call_args.args
+        assert info_class is mock_win32file.FileDispositionInfo
+        assert delete is True
+        assert handle.closed
+
+    def test_delete_closes_handle_on_failure(self, mock_win32file: MagicMock) -> None:
+        pwd_mod.set_password("bye")
+        seen: list[_FakeFileHandle] = []
+
+        def refuse(handle: _FakeFileHandle, *_args: object) -> None:
+            seen.append(handle)
+            raise pwd_mod.pywintypes.error("denied")
+
+        mock_win32file.SetFileInformationByHandle.side_effect = refuse
+        with pytest.raises(pwd_mod.pywintypes.error):
+            pwd_mod.delete_password()
+        assert seen[0].closed
+
+    def test_delete_retries_sharing_violation(
+        self, mock_win32file: MagicMock, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        pwd_mod.set_password("bye")
+        monkeypatch.setattr(pwd_mod.time, "sleep", lambda _s: None)
+        busy = pwd_mod.pywintypes.error("busy", winerror=winerror.ERROR_SHARING_VIOLATION)
+        mock_win32file.CreateFile.side_effect = [busy, busy, _FakeFileHandle(str(pwd_mod._PASSWD_FILE))]
+        pwd_mod.delete_password()
+        assert mock_win32file.CreateFile.call_count == 3
+        assert not pwd_mod.has_password()
+
+    def test_delete_gives_up_after_bounded_retries(
+        self, mock_win32file: MagicMock, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        pwd_mod.set_password("bye")
+        monkeypatch.setattr(pwd_mod.time, "sleep", lambda _s: None)
+        busy = pwd_mod.pywintypes.error("busy", winerror=winerror.ERROR_SHARING_VIOLATION)
+        mock_win32file.CreateFile.side_effect = busy
+        with pytest.raises(pwd_mod.pywintypes.error):
+            pwd_mod.delete_password()
+        assert mock_win32file.CreateFile.call_count == pwd_mod._DELETE_ATTEMPTS
+
 
 # ── uninstall_app_data ────────────────────────────────────────────────────
 class TestUninstall:
@@ -1,14 +1,13 @@
 """
 test_scheduler.py — Unit tests for core/scheduler.py.
 
-All tests use very short timeouts (milliseconds) so the suite runs fast.
-The actual shutdown callback is never called for real — we only test that
-it IS or IS NOT called.
+Timers run against a virtual clock whose wait() advances time instantly, so
+no test sleeps in real time.  The actual shutdown callback is never called
+for real — we only test that it IS or IS NOT called.
 """
 from __future__ import annotations
 
 import threading
-import time
 from datetime import datetime, timedelta
 
 import pytest
@@ -30,22 +29,44 @@ class _Flag:
         return self.event.wait(timeout)
 
 
+class _VirtualClock:
+    """Stands in for time.monotonic(); each wait() jumps straight to its end."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.waits: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def wait(self, timeout: float) -> bool:
+        self.waits.append(timeout)
+        self.now += timeout
+        return False
+
+
+def _virtual_scheduler(callback) -> tuple[ShutdownScheduler, _VirtualClock]:
+    clock = _VirtualClock()
+    return ShutdownScheduler(callback=callback, _clock=clock, _wait=clock.wait), clock
+
+
 # ── schedule_duration ──────────────────────────────────────────────────────
 class TestScheduleDuration:
     def test_fires_after_delay(self) -> None:
         flag = _Flag()
-        s = ShutdownScheduler(callback=flag.trigger)
-        s.schedule_duration(minutes=0.01)   # ~0.6 s
+        s, clock = _virtual_scheduler(flag.trigger)
+        s.schedule_duration(minutes=30)
         assert flag.wait(timeout=2.0), "Callback was not called within timeout"
-        assert flag.called
+        assert sum(clock.waits) == pytest.approx(30 * 60)
 
     def test_does_not_fire_when_cancelled(self) -> None:
         flag = _Flag()
         s = ShutdownScheduler(callback=flag.trigger)
         s.schedule_duration(minutes=0.5)    # 30 s — long enough to cancel
-        time.sleep(0.05)
         s.cancel()
-        assert not flag.wait(timeout=0.3), "Callback should NOT have been called after cancel"
+        s._thread.join(timeout=1.0)
+        assert not s.is_active
+        assert not flag.called, "Callback should NOT have been called after cancel"
 
     def test_rejects_zero_minutes(self) -> None:
         s = ShutdownScheduler(callback=lambda: None)
@@ -71,6 +92,22 @@ class TestScheduleDuration:
         s._thread.join(timeout=1.0)
         assert not s.is_active
 
+    def test_rewaits_after_early_wakeup(self) -> None:
+        """A wait that returns before the deadline must not fire the callback."""
+        flag = _Flag()
+        clock = _VirtualClock()
+
+        def early_wait(timeout: float) -> bool:
+            clock.waits.append(timeout)
+            clock.now += timeout / 2      # woke up early, not cancelled
+            return False
+
+        s = ShutdownScheduler(callback=flag.trigger, _clock=clock, _wait=early_wait)
+        s.schedule_duration(minutes=1)
+        assert flag.wait(timeout=2.0)
+        assert len(clock.waits) >= 2
+        assert clock.waits[1] == pytest.approx(30.0)
+
     def test_rejects_double_start(self) -> None:
         s = ShutdownScheduler(callback=lambda: None)
         s.schedule_duration(minutes=1)
@@ -78,15 +115,24 @@ class TestScheduleDuration:
             s.schedule_duration(minutes=1)
         s.cancel()
 
+    def test_double_start_keeps_original_deadline(self) -> None:
+        s = ShutdownScheduler(callback=lambda: None)
+        s.schedule_duration(minutes=10)
+        with pytest.raises(RuntimeError):
+            s.schedule_duration(minutes=1)
+        assert s.time_remaining() > 60
+        s.cancel()
+
 
 # ── schedule_at ────────────────────────────────────────────────────────────
 class TestScheduleAt:
     def test_fires_at_target_time(self) -> None:
         flag = _Flag()
-        s = ShutdownScheduler(callback=flag.trigger)
-        target = datetime.now() + timedelta(seconds=0.6)
+        s, clock = _virtual_scheduler(flag.trigger)
+        target = datetime.now() + timedelta(hours=2)
         s.schedule_at(target)
         assert flag.wait(timeout=2.0), "Callback was not called within timeout"
+        assert sum(clock.waits) == pytest.approx(2 * 3600, abs=1.0)
 
     def test_rejects_past_time(self) -> None:
         s = ShutdownScheduler(callback=lambda: None)
@@ -106,9 +152,14 @@ class TestTimeRemaining:
         s.schedule_duration(minutes=10)
         rem = s.time_remaining()
         assert rem is not None
-        assert rem.total_seconds() > 0
+        assert 0 < rem <= 600
         s.cancel()
 
+    def test_zero_when_overdue(self) -> None:
+        s, clock = _virtual_scheduler(lambda: None)
+        s._deadline = clock() - 5
+        assert s.time_remaining() == 0.0
+
     def test_cancel_is_idempotent(self) -> None:
         s = ShutdownScheduler(callback=lambda: None)
         s.schedule_duration(minutes=1)